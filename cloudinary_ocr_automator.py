@@ -1,11 +1,25 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
 import re
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import base64
+import gzip
 import os
-from ftplib import FTP
+from ftplib import FTP, error_temp
 import subprocess
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from collections import Counter, deque
+
+# google-re2 matches in linear time, so garbled OCR text can't make the parsing
+# patterns backtrack; fall back to the standard library when it isn't installed.
+try:
+    import re2 as re_engine
+except ImportError:
+    re_engine = re
 
 # Retrieve secrets from GitHub Actions environment variables
 CLOUD_NAME = os.getenv('CLOUDINARY_CLOUD_NAME')
@@ -15,32 +29,82 @@ OCR_API_KEY = os.getenv('OCR_API_KEY')
 FTP_SERVER = os.getenv('FTP_SERVER')
 FTP_USERNAME = os.getenv('FTP_USERNAME')
 FTP_PASSWORD = os.getenv('FTP_PASSWORD')
+FTP_BLOCKSIZE = 1 << 20  # 1 MiB per send instead of ftplib's 8 KiB default
+FTP_UPLOAD_WORKERS = int(os.getenv('FTP_UPLOAD_WORKERS', '4'))
 FOLDER_PREFIX = 'website-screenshots/'
-MAX_RESULTS = 170
+OUTPUT_PATH = 'data/eBayListings.json'
+JOURNAL_PATH = 'data/eBayListings.jsonl'
+CURSOR_PATH = 'data/.last_cursor'
+# The Search index can lag behind uploads, so the saved cursor trails the newest
+# listed upload by this much; re-listed Complete images are skipped anyway
+CURSOR_OVERLAP = timedelta(days=1)
+OCR_CACHE_PATH = 'data/ocrCache.json'
+MAX_RESULTS = 500  # Search API maximum per page
+OCR_CONCURRENCY = int(os.getenv('OCR_CONCURRENCY', '8'))
+OCR_MAX_RPS = float(os.getenv('OCR_MAX_RPS', '0'))  # 0 disables throttling
+OCR_MAX_PER_HOUR = int(os.getenv('OCR_MAX_PER_HOUR', '0'))  # 0 disables the hourly cap
+OCR_TIMEOUT = 60  # seconds
+OCR_MAX_ATTEMPTS = 3
+OCR_RETRY_MAX_DELAY = 30  # seconds
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# One pooled HTTP session so Cloudinary and OCR.space connections are kept alive
+# and reused instead of paying a TCP + TLS handshake per request. The pool is
+# at least as large as the OCR thread pool so no worker's connection is discarded.
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=max(16, OCR_CONCURRENCY)))
+
+# Patterns used by parse_ocr_to_json, compiled once at import. Keyword patterns
+# are case-insensitive via an inline (?i) flag, which re2 also supports.
+TITLE_RE = re_engine.compile(
+    r'(?i)sold\s+[a-z]{3}\s+\d{1,2},?\s+\d{4}\s+(.+?)(?:\s+(?:brand new|pre-owned|new|used|\$\d+))'
+)
+# eBay prints "Sold", but OCR sometimes returns "SOLD"
+SOLD_RE = re_engine.compile(r'(?i)sold ')
+# Only ever matched at the offset right after "Sold ", never searched
+SOLD_DATE_RE = re_engine.compile(r'[A-Za-z]{3}\s+\d{1,2},?\s+\d{4}')
+# Price and seller in one alternation so the text is scanned once; the first
+# match of each named group wins
+FIELDS_RE = re_engine.compile(
+    r'(?i)\$(?P<sold_price>\d+\.\d{2})'
+    r'|(?:^|\s)(?P<seller>[a-z0-9_-]+)\s+\d{2,3}(?:\.\d+)?%\s+positive'
+)
+SELLER_KEYWORD_RE = re_engine.compile(r'(?i)seller[:\s]+([a-z0-9_-]+)')
 
-# Step 1: List ALL images from Cloudinary with pagination
-def list_cloudinary_images():
-    url = f'https://api.cloudinary.com/v1_1/{CLOUD_NAME}/resources/image'
+# Step 1: List images from Cloudinary with pagination, optionally only those
+# uploaded after a previous run's cursor. Results are newest first, so paging
+# stops at the first page whose images are all in complete_ids. Also returns
+# whether the listing is partial (cursor-limited or stopped early), in which
+# case older images were left out rather than deleted.
+def list_cloudinary_images(uploaded_after=None, complete_ids=frozenset()):
+    # The Search API filters by folder and format server-side, so pages only
+    # carry the screenshots we can OCR and only the fields we read
+    url = f'https://api.cloudinary.com/v1_1/{CLOUD_NAME}/resources/search'
     auth = base64.b64encode(f'{API_KEY}:{API_SECRET}'.encode()).decode()
     headers = {'Authorization': f'Basic {auth}'}
+    expression = f'folder:{FOLDER_PREFIX}* AND type:upload AND (format:jpg OR format:png OR format:webp)'
+    if uploaded_after:
+        expression += f' AND uploaded_at>"{uploaded_after}"'
+        print(f'Listing images uploaded after {uploaded_after}')
     
     all_resources = []
     next_cursor = None
     page = 1
+    stopped_early = False
     
     while True:
-        params = {
-            'type': 'upload',
-            'prefix': FOLDER_PREFIX,
+        payload = {
+            'expression': expression,
             'max_results': MAX_RESULTS,
-            'direction': 'desc'
+            'sort_by': [{'created_at': 'desc'}],
+            'fields': ['public_id', 'secure_url', 'uploaded_at']
         }
         
         if next_cursor:
-            params['next_cursor'] = next_cursor
+            payload['next_cursor'] = next_cursor
         
         print(f'Fetching page {page} from Cloudinary...')
-        response = requests.get(url, params=params, headers=headers)
+        response = SESSION.post(url, json=payload, headers=headers)
         
         if response.status_code != 200:
             raise Exception(f'Error listing images: {response.text}')
@@ -51,6 +115,12 @@ def list_cloudinary_images():
         
         print(f'  Retrieved {len(resources)} images (Total so far: {len(all_resources)})')
         
+        # Everything older than an all-Complete page was handled by earlier runs
+        if resources and all(res['public_id'].rpartition('/')[2] in complete_ids for res in resources):
+            print('Page is already fully processed, stopping pagination.')
+            stopped_early = True
+            break
+        
         # Check if there are more pages
         next_cursor = data.get('next_cursor')
         if not next_cursor:
@@ -59,15 +129,49 @@ def list_cloudinary_images():
         
         page += 1
     
-    # Filter for valid image formats and return tuples
-    valid_images = [(res['secure_url'], res['public_id']) for res in all_resources 
-                    if res['format'] in ['jpg', 'png', 'webp']]
+    # Entries are keyed by the public_id without its folder, so strip it once here
+    valid_images = [(res['secure_url'], res['public_id'].rpartition('/')[2]) for res in all_resources]
+    newest_uploaded_at = max((res['uploaded_at'] for res in all_resources), default=None)
     
     print(f'Valid images (jpg/png/webp): {len(valid_images)}')
-    return valid_images
+    return valid_images, newest_uploaded_at, bool(uploaded_after) or stopped_early
+
+# OCR.space reports quota/throttling problems in ErrorMessage, sometimes with a 200
+def is_rate_limit_message(message):
+    message = message.lower()
+    return 'rate limit' in message or 'quota' in message
+
+# Retry-After in delay-seconds form; the HTTP-date form is ignored
+def parse_retry_after(value):
+    if value and value.strip().isdigit():
+        return int(value)
+    return None
+
+# Space OCR requests out across all worker threads so bursts from the pool
+# stay under OCR.space's per-second limit, and keep a sliding window of the
+# last hour's start times so a long run stays under the hourly quota. Start
+# times are handed out in order under the lock; each caller sleeps until its own.
+ocr_rate_lock = threading.Lock()
+ocr_next_slot = 0.0
+ocr_window = deque()
+
+def wait_for_ocr_slot():
+    global ocr_next_slot
+    if OCR_MAX_RPS <= 0 and OCR_MAX_PER_HOUR <= 0:
+        return
+    with ocr_rate_lock:
+        now = time.monotonic()
+        slot = max(now, ocr_next_slot)
+        if OCR_MAX_PER_HOUR > 0:
+            if len(ocr_window) >= OCR_MAX_PER_HOUR:
+                slot = max(slot, ocr_window.popleft() + 3600)
+            ocr_window.append(slot)
+        ocr_next_slot = slot + 1 / OCR_MAX_RPS if OCR_MAX_RPS > 0 else slot
+    if slot > now:
+        time.sleep(slot - now)
 
 # Step 2: OCR extract text from image URL
-def ocr_extract_text(image_url):
+def ocr_extract_text(image_url, short_id):
     ocr_url = 'https://api.ocr.space/parse/imageurl'
     params = {
         'apikey': OCR_API_KEY,
@@ -76,69 +180,87 @@ def ocr_extract_text(image_url):
         'isOverlayRequired': 'false',
         'OCREngine': 2  # Try engine 2 for better accuracy
     }
-    response = requests.get(ocr_url, params=params)
-    if response.status_code != 200:
-        raise Exception(f'OCR error: {response.text}')
     
-    result = response.json()
-    if result.get('OCRExitCode') != 1:
-        raise Exception(f'OCR failed: {result.get("ErrorMessage")}')
+    # Retry throttling (429), server errors and timeouts with exponential backoff
+    for attempt in range(1, OCR_MAX_ATTEMPTS + 1):
+        retry_after = None
+        wait_for_ocr_slot()
+        try:
+            response = SESSION.get(ocr_url, params=params, timeout=OCR_TIMEOUT)
+        except (requests.Timeout, requests.ConnectionError) as e:
+            error = f'OCR request error: {e}'
+        else:
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                error = f'OCR error: {response.text}'
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            elif response.status_code != 200:
+                raise Exception(f'OCR error: {response.text}')
+            else:
+                result = response.json()
+                if result.get('OCRExitCode') == 1:
+                    break
+                error_message = str(result.get('ErrorMessage'))
+                if not is_rate_limit_message(error_message):
+                    raise Exception(f'OCR failed: {error_message}')
+                error = f'OCR failed: {error_message}'
+        
+        if attempt == OCR_MAX_ATTEMPTS:
+            raise Exception(error)
+        # Wait as long as the server asks, if it says, within the same cap
+        delay = min(OCR_RETRY_MAX_DELAY, max(2 ** (attempt - 1), retry_after or 0))
+        print(f'OCR attempt {attempt}/{OCR_MAX_ATTEMPTS} failed, retrying in {delay}s: {error}')
+        time.sleep(delay)
     
     # Get the full ParsedText
     parsed_text = result['ParsedResults'][0]['ParsedText'].strip()
     
-    # Log the raw OCR output for debugging
-    print(f"\n--- RAW OCR OUTPUT ---")
-    print(parsed_text)
-    print(f"--- END RAW OUTPUT ---\n")
+    # Log the raw OCR output for debugging. OCR runs on several threads, so the
+    # block is tagged with the image id and printed in one call to keep it whole
+    print(f"\n--- RAW OCR OUTPUT ({short_id}) ---\n{parsed_text}\n--- END RAW OUTPUT ({short_id}) ---\n")
     
     return parsed_text
 
+# Find the "Sold" marker with a literal search and only try the date pattern
+# right after it, instead of running the full date regex over the whole text
+def find_sold_date(clean_text):
+    for sold in SOLD_RE.finditer(clean_text):
+        match = SOLD_DATE_RE.match(clean_text, sold.end())
+        if match:
+            return match.group()
+    return None
+
 # Step 3: Parse OCR text to structured dict
-def parse_ocr_to_json(raw_text, url, public_id):
-    # Replace newlines and carriage returns with spaces for easier parsing
-    clean_text = re.sub(r'[\r\n]+', ' ', raw_text)
-    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+def parse_ocr_to_json(raw_text, url, short_id, processed_at):
+    # Collapse newlines and runs of whitespace into single spaces in one pass
+    clean_text = ' '.join(raw_text.split())
+    
+    print(f"Clean text ({short_id}): {clean_text[:200]}...")  # Debug output
     
-    print(f"Clean text: {clean_text[:200]}...")  # Debug output
+    sold_date = find_sold_date(clean_text)
     
-    # Extract sold date - more flexible pattern
-    sold_date_match = re.search(r'Sold\s+([A-Za-z]{3}\s+\d{1,2},?\s+\d{4})', clean_text, re.IGNORECASE)
+    # Extract price and seller ("username 99.5% positive (1K)")
+    fields = {}
+    for match in FIELDS_RE.finditer(clean_text):
+        name = match.lastgroup
+        if name not in fields:
+            fields[name] = match.group(name)
+            if len(fields) == 2:
+                break
     
     # Extract title - look for text between date and condition/price indicators
     # Title typically comes after "Sold [date]" and before "Brand New", "Pre-Owned", or price
-    title_match = re.search(
-        r'Sold\s+[A-Za-z]{3}\s+\d{1,2},?\s+\d{4}\s+(.+?)(?:\s+(?:Brand New|Pre-Owned|New|Used|\$\d+))',
-        clean_text,
-        re.IGNORECASE
-    )
-    
-    # Extract price - look for dollar amount
-    price_match = re.search(r'\$(\d+\.\d{2})', clean_text)
-    
-    # Extract seller - look for various seller patterns
-    # Pattern 1: "username 99.5% positive (1K)" or similar
-    seller_match = re.search(
-        r'(?:^|\s)([a-zA-Z0-9_-]+)\s+\d{2,3}(?:\.\d+)?%\s+positive',
-        clean_text,
-        re.IGNORECASE
-    )
+    title_match = TITLE_RE.search(clean_text)
     
-    # If first pattern fails, try alternative patterns
-    if not seller_match:
-        # Pattern 2: Look for seller after specific keywords
-        seller_match = re.search(r'seller[:\s]+([a-zA-Z0-9_-]+)', clean_text, re.IGNORECASE)
-    
-    # Extract item ID if present
-    item_id_match = re.search(r'(?:Item|ID)[:\s#]*(\d+)', clean_text, re.IGNORECASE)
-    
-    now = datetime.utcnow().isoformat() + 'Z'
+    # If the "% positive" pattern fails, look for seller after specific keywords
+    if 'seller' not in fields:
+        seller_match = SELLER_KEYWORD_RE.search(clean_text)
+        if seller_match:
+            fields['seller'] = seller_match.group(1)
     
     # Determine success status based on critical fields
-    sold_date = sold_date_match.group(1) if sold_date_match else None
     title = title_match.group(1).strip() if title_match else None
-    sold_price = price_match.group(1) if price_match else None
-    seller = seller_match.group(1) if seller_match else None
+    sold_price = fields.get('sold_price')
+    seller = fields.get('seller')
     
     # Set success status
     if sold_date and title and sold_price:
@@ -153,26 +275,66 @@ def parse_ocr_to_json(raw_text, url, public_id):
         "sold_price": sold_price,
         "seller": seller,
         "image_url": url,
-        "processed_at": now,
-        "public_id": public_id.split('/')[-1],
+        "processed_at": processed_at,
+        "public_id": short_id,
         "success": success_status
     }
     
     return result
 
+# OCR and parse a single image; failures become a "Fail" entry.
+# Returns (entry, raw_text) so the caller can cache the OCR output.
+def process_image(url, pid, cached_text, processed_at):
+    try:
+        if cached_text is None:
+            raw_text = ocr_extract_text(url, pid)
+        else:
+            print(f'Using cached OCR text for {pid}')
+            raw_text = cached_text
+        return parse_ocr_to_json(raw_text, url, pid, processed_at), raw_text
+    except Exception as e:
+        print(f'✗ Fail: {pid} - {e}')
+        return {
+            "sold_date": None,
+            "title": "Error extracting",
+            "sold_price": None,
+            "seller": None,
+            "image_url": url,
+            "processed_at": processed_at,
+            "public_id": pid,
+            "success": "Fail"
+        }, None
+
 # Step 4: Upload file to FTP server
+def store_on_ftp(file, remote_path):
+    with FTP(FTP_SERVER) as ftp:
+        ftp.login(user=FTP_USERNAME, passwd=FTP_PASSWORD)
+        ftp.storbinary(f'STOR {remote_path}', file, blocksize=FTP_BLOCKSIZE)
+
 def upload_to_ftp(local_path, remote_path):
     try:
-        with FTP(FTP_SERVER) as ftp:
-            ftp.login(user=FTP_USERNAME, passwd=FTP_PASSWORD)
-            with open(local_path, 'rb') as file:
-                ftp.storbinary(f'STOR {remote_path}', file)
-            ftp.quit()
+        with open(local_path, 'rb') as file:
+            try:
+                store_on_ftp(file, remote_path)
+            except (error_temp, EOFError, OSError):
+                # The connection dropped or the server was briefly busy; reconnect once
+                file.seek(0)
+                store_on_ftp(file, remote_path)
         print(f'Uploaded {local_path} to {remote_path}')
     except Exception as e:
         print(f'FTP upload error: {e}')
         raise
 
+# Upload (local_path, remote_path) pairs over up to `workers` parallel FTP
+# connections, each file on its own, so per-file latency overlaps
+def upload_many_to_ftp(pairs, workers=FTP_UPLOAD_WORKERS):
+    workers = max(1, min(workers, len(pairs)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(upload_to_ftp, local_path, remote_path)
+                   for local_path, remote_path in pairs]
+        for future in futures:
+            future.result()
+
 # Step 5: Load existing JSON data
 def load_existing_json(filepath):
     """Load existing JSON file if it exists, return empty list if not."""
@@ -181,8 +343,8 @@ def load_existing_json(filepath):
     
     if os.path.exists(filepath):
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
                 print(f'Loaded {len(data)} existing entries from {filepath}')
                 return data
         except Exception as e:
@@ -192,44 +354,156 @@ def load_existing_json(filepath):
         print(f'No existing JSON found at {filepath}, starting fresh.')
         return []
 
+def read_bytes(filepath):
+    """Return the file's contents, or None if it doesn't exist."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+# Write to a temp file and rename it over the target, so a reader (or an
+# interrupted run) never sees a half-written file
+def write_file_atomic(filepath, data):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+
+# Step 6: Load entries journaled by a run that did not reach the final save
+def load_journal(filepath):
+    """Load newline-delimited entries from the journal, return empty list if none."""
+    if not os.path.exists(filepath):
+        return []
+    
+    entries = []
+    with open(filepath, 'rb') as f:
+        for line in f:
+            try:
+                entries.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                # A crash mid-append can leave a torn last line
+                break
+    print(f'Recovered {len(entries)} journaled entries from {filepath}')
+    return entries
+
+# Step 7: Read/write the upload time of the newest image already listed
+def load_cursor(filepath):
+    """Return the saved uploaded_at cursor, or None to list everything."""
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return f.read().strip() or None
+
+def save_cursor(filepath, uploaded_at):
+    # Step back by CURSOR_OVERLAP so uploads indexed late, or in the same
+    # second as the newest one, are still listed by the next run
+    cursor = datetime.fromisoformat(uploaded_at.replace('Z', '+00:00')) - CURSOR_OVERLAP
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(cursor.strftime('%Y-%m-%dT%H:%M:%SZ') + '\n')
+
+# Step 8: Raw OCR text by public_id, so re-parsing never pays for OCR twice.
+# Each entry records the image URL it came from; Cloudinary URLs carry the
+# asset version, so a re-uploaded screenshot misses the cache and is OCR'd again.
+def load_ocr_cache(filepath):
+    """Load the OCR text cache if it exists, return empty dict if not."""
+    if not os.path.exists(filepath):
+        return {}
+    try:
+        with open(filepath, 'rb') as f:
+            cache = orjson.loads(f.read())
+    except Exception as e:
+        print(f'Error loading OCR cache: {e}')
+        return {}
+    print(f'Loaded {len(cache)} cached OCR texts from {filepath}')
+    return cache
+
+def get_cached_ocr_text(cache, pid, url):
+    entry = cache.get(pid)
+    if entry and entry.get('image_url') == url:
+        return entry['raw_text']
+    return None
+
+def save_ocr_cache(filepath, cache):
+    write_file_atomic(filepath, orjson.dumps(cache, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+
+# Step 9: Commit the given data files and push them to GitHub
+def commit_and_push(paths, commit_message):
+    try:
+        subprocess.run(['git', 'add', *paths], check=True)
+        
+        # Nothing staged means the data is unchanged, so skip the commit and push
+        if subprocess.run(['git', 'diff', '--cached', '--quiet', '--', *paths]).returncode == 0:
+            print('No data changes to commit')
+            return
+        
+        # Pass the identity per command instead of two extra `git config` processes
+        subprocess.run(['git', '-c', 'user.name=GitHub Action', '-c', 'user.email=action@github.com',
+                        'commit', '-m', commit_message], check=True)
+        subprocess.run(['git', 'push', 'origin', 'main'], check=True)
+        print('Committed and pushed to GitHub')
+    except subprocess.CalledProcessError as e:
+        print(f'Git error: {e}, continuing without commit')
+
 # Main automation
 def main():
-    images = list_cloudinary_images()
-    print(f'Found {len(images)} images from Cloudinary.')
-    
     # Load existing data
-    output_path = 'data/eBayListings.json'
+    output_path = OUTPUT_PATH
     existing_data = load_existing_json(output_path)
     
     # Create lookup dict by public_id for existing data
-    existing_by_id = {entry.get('public_id'): entry for entry in existing_data if entry.get('public_id')}
+    existing_by_id = {pid: entry for entry in existing_data if (pid := entry.get('public_id'))}
+    
+    # Entries processed by an interrupted run supersede the saved JSON
+    journaled = load_journal(JOURNAL_PATH)
+    for entry in journaled:
+        existing_by_id[entry['public_id']] = entry
     print(f'Loaded {len(existing_by_id)} existing entries')
     
-    # Separate entries by status
-    complete_ids = {pid for pid, entry in existing_by_id.items() if entry.get('success') == 'Complete'}
-    reprocess_ids = {pid for pid, entry in existing_by_id.items() if entry.get('success') == 'Reprocess'}
-    fail_ids = {pid for pid, entry in existing_by_id.items() if entry.get('success') == 'Fail'}
+    # Separate entries by status in one pass
+    complete_ids, reprocess_ids, fail_ids = set(), set(), set()
+    buckets = {'Complete': complete_ids, 'Reprocess': reprocess_ids, 'Fail': fail_ids}
+    for pid, entry in existing_by_id.items():
+        bucket = buckets.get(entry.get('success'))
+        if bucket is not None:
+            bucket.add(pid)
     
     print(f'Complete: {len(complete_ids)}, Reprocess: {len(reprocess_ids)}, Fail: {len(fail_ids)}')
     
+    cursor = load_cursor(CURSOR_PATH)
+    images, newest_uploaded_at, partial_listing = list_cloudinary_images(uploaded_after=cursor, complete_ids=complete_ids)
+    print(f'Found {len(images)} images from Cloudinary.')
+    
     # Determine which images need processing
     images_to_process = []
     for url, pid in images:
-        public_id = pid.split('/')[-1]
-        if public_id in complete_ids:
+        if pid in complete_ids:
             # Skip Complete entries (including manual edits)
             continue
-        elif public_id in reprocess_ids or public_id in fail_ids:
+        elif pid in reprocess_ids or pid in fail_ids:
             # Retry Reprocess and Fail entries
             images_to_process.append((url, pid))
         else:
             # New image, needs processing
             images_to_process.append((url, pid))
     
+    # A partial listing leaves out older uploads, so retry Reprocess and Fail
+    # entries that were not listed from the image_url stored with them. In a
+    # full listing a missing entry means its image was deleted; skip it
+    if partial_listing:
+        listed_ids = {pid for _, pid in images}
+        for pid, entry in existing_by_id.items():
+            if entry.get('success') in ('Reprocess', 'Fail') and pid not in listed_ids:
+                images_to_process.append((entry['image_url'], pid))
+    
     print(f'Images to process: {len(images_to_process)} (New + Reprocess + Fail)')
     
-    if len(images_to_process) == 0:
+    if len(images_to_process) == 0 and not journaled:
         print('No images to process. All Complete entries will be preserved.')
+        # Everything listed is already Complete, so the cursor can still move up
+        if newest_uploaded_at:
+            save_cursor(CURSOR_PATH, newest_uploaded_at)
+            commit_and_push([CURSOR_PATH], f'Update {CURSOR_PATH} - no new images at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
         return
     
     # Start with all existing data
@@ -239,11 +513,27 @@ def main():
     reprocess_count = 0
     fail_count = 0
     
-    for url, public_id in images_to_process:
-        pid = public_id.split('/')[-1]
-        try:
-            raw_text = ocr_extract_text(url)
-            parsed = parse_ocr_to_json(raw_text, url, public_id)
+    # One timestamp for every entry processed in this run
+    run_ts = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+    
+    # Images already OCR'd (e.g. Reprocess entries) are re-parsed from the cache
+    ocr_cache = load_ocr_cache(OCR_CACHE_PATH)
+    
+    # OCR calls are network-bound, so fan them out over a bounded thread pool.
+    # executor.map yields results in submission order, keeping output stable.
+    urls = [url for url, _ in images_to_process]
+    pids = [pid for _, pid in images_to_process]
+    cached_texts = [get_cached_ocr_text(ocr_cache, pid, url) for url, pid in images_to_process]
+    # Each result is appended to the journal as it arrives, so an interrupted
+    # run keeps its OCR work without rewriting the whole JSON per image
+    with ThreadPoolExecutor(max_workers=OCR_CONCURRENCY) as executor, \
+            open(JOURNAL_PATH, 'ab') as journal:
+        for parsed, raw_text in executor.map(process_image, urls, pids, cached_texts, repeat(run_ts)):
+            pid = parsed["public_id"]
+            if raw_text is not None:
+                ocr_cache[pid] = {'image_url': parsed['image_url'], 'raw_text': raw_text}
+            journal.write(orjson.dumps(parsed) + b'\n')
+            journal.flush()
             
             # Update or add to results
             results_by_id[pid] = parsed
@@ -255,69 +545,69 @@ def main():
             elif parsed["success"] == "Reprocess":
                 reprocess_count += 1
                 print(f'⚠ Reprocess: {pid} (missing fields)')
-                
-        except Exception as e:
-            fail_count += 1
-            error_msg = str(e)
-            print(f'✗ Fail: {pid} - {error_msg}')
-            
-            # Add/update failed entry with "Fail" status
-            results_by_id[pid] = {
-                "sold_date": None,
-                "title": "Error extracting",
-                "sold_price": None,
-                "seller": None,
-                "image_url": url,
-                "processed_at": datetime.utcnow().isoformat() + 'Z',
-                "public_id": pid,
-                "success": "Fail"
-            }
+            else:
+                fail_count += 1
     
     # Convert back to list
     results = list(results_by_id.values())
     
     # Count final status breakdown
-    final_complete = sum(1 for r in results if r.get('success') == 'Complete')
-    final_reprocess = sum(1 for r in results if r.get('success') == 'Reprocess')
-    final_fail = sum(1 for r in results if r.get('success') == 'Fail')
+    final_counts = Counter(r.get('success') for r in results)
     
     print(f'\n=== Processing Summary ===')
-    print(f'Total images in Cloudinary: {len(images)}')
+    print(f'Images listed from Cloudinary: {len(images)}')
     print(f'Images processed this run: {len(images_to_process)}')
     print(f'  - New Complete: {complete_count}')
     print(f'  - New Reprocess: {reprocess_count}')
     print(f'  - New Fail: {fail_count}')
     print(f'\n=== Final Status ===')
-    print(f'Complete: {final_complete}')
-    print(f'Reprocess: {final_reprocess}')
-    print(f'Fail: {final_fail}')
+    print(f'Complete: {final_counts["Complete"]}')
+    print(f'Reprocess: {final_counts["Reprocess"]}')
+    print(f'Fail: {final_counts["Fail"]}')
     print(f'Total entries: {len(results)}')
     
-    # Save to local JSON file
-    output_path = 'data/eBayListings.json'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=4, ensure_ascii=False)
-    print(f'\nSaved {len(results)} total entries to {output_path}')
+    # Save to local JSON file, plus a gzipped copy for a smaller FTP upload.
+    # Skip both (and the FTP upload) when the output is byte-identical.
+    payload = orjson.dumps(results, option=orjson.OPT_INDENT_2)
+    output_changed = read_bytes(output_path) != payload
+    if output_changed:
+        write_file_atomic(output_path, payload)
+        write_file_atomic(output_path + '.gz', gzip.compress(payload, compresslevel=6))
+        print(f'\nSaved {len(results)} total entries to {output_path}')
+    else:
+        print(f'\n{output_path} is unchanged')
+    
+    # Complete entries are skipped by id and never re-parsed, so only the text
+    # of entries that may still be retried is kept; the cache stays bounded
+    ocr_cache = {pid: entry for pid, entry in ocr_cache.items()
+                 if pid in results_by_id and results_by_id[pid].get('success') != 'Complete'}
+    save_ocr_cache(OCR_CACHE_PATH, ocr_cache)
+    
+    # Everything journaled is now in the JSON
+    if os.path.exists(JOURNAL_PATH):
+        os.remove(JOURNAL_PATH)
+    
+    # Only advance the cursor once the listed images are saved
+    if newest_uploaded_at:
+        save_cursor(CURSOR_PATH, newest_uploaded_at)
 
     # Upload to FTP server
     try:
-        remote_path = 'public_html/data/eBayListings.json'
-        upload_to_ftp(output_path, remote_path)
+        if output_changed:
+            remote_path = 'public_html/data/eBayListings.json'
+            # The .gz copy is served to clients that accept gzip; the plain copy
+            # stays for the rest
+            upload_many_to_ftp([
+                (output_path, remote_path),
+                (output_path + '.gz', remote_path + '.gz'),
+            ])
     except Exception as e:
         print(f'Warning: FTP upload failed but continuing: {e}')
 
     # Commit and push to GitHub
-    try:
-        subprocess.run(['git', 'config', '--global', 'user.name', 'GitHub Action'], check=True)
-        subprocess.run(['git', 'config', '--global', 'user.email', 'action@github.com'], check=True)
-        subprocess.run(['git', 'add', output_path], check=True)
-        
-        commit_message = f'Update eBayListings.json - Processed {len(images_to_process)} images ({complete_count} complete, {reprocess_count} reprocess, {fail_count} fail) at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
-        subprocess.run(['git', 'commit', '-m', commit_message], check=True)
-        subprocess.run(['git', 'push', 'origin', 'main'], check=True)
-        print('Committed and pushed to GitHub')
-    except subprocess.CalledProcessError as e:
-        print(f'Git error: {e}, continuing without commit')
+    tracked_paths = [output_path] + ([CURSOR_PATH] if os.path.exists(CURSOR_PATH) else [])
+    commit_message = f'Update eBayListings.json - Processed {len(images_to_process)} images ({complete_count} complete, {reprocess_count} reprocess, {fail_count} fail) at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+    commit_and_push(tracked_paths, commit_message)
 
 if __name__ == '__main__':
     main()
@@ -1,64 +1,167 @@
-import json
+import orjson
 import re
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-import time
+import lxml.html
+from lxml import etree
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 import requests
-from io import BytesIO
-from PIL import Image
+from requests.adapters import HTTPAdapter
 import pytesseract
+import threading
+import traceback
 import cv2
 import numpy as np
 
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', str(os.cpu_count() or 4)))
+IMAGE_TIMEOUT = (5, 30)  # connect, read seconds
+
+# One pooled HTTP session so screenshot downloads reuse kept-alive connections
+# instead of paying a TCP + TLS handshake per image. The pool is at least as
+# large as the extract thread pool so no worker's connection is discarded.
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=max(16, EXTRACT_WORKERS)))
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=max(16, EXTRACT_WORKERS)))
+DEBUG = os.getenv('EBAY_DEBUG') == '1'
+# Simpler config (removed problematic whitelist). Listing text is mostly
+# usernames, prices and product names, so skip the dictionary word lists.
+# LSTM engine only, so the legacy engine is never loaded.
+TESSERACT_CONFIG = r'--oem 1 --psm 6 -c load_system_dawg=0 -c load_freq_dawg=0'
+# 3x3 sharpen for preprocess_image, as the float32 filter2D works in internally
+SHARPEN_KERNEL = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]], np.float32)
+# Longest image edge handed to Tesseract; larger screenshots are shrunk first
+# since OCR time grows with pixel count (0 disables)
+OCR_MAX_EDGE = int(os.getenv('OCR_MAX_EDGE', '1600'))
+# Binarization before OCR: 'adaptive' (local Gaussian threshold) or 'otsu'
+# (one global threshold, cheaper but untested on uneven lighting)
+OCR_THRESHOLD = os.getenv('OCR_THRESHOLD', 'adaptive')
+
+# Patterns for clean_ocr_text and extract_ebay_listings, compiled once at import
+O_BETWEEN_LETTERS_RE = re.compile(r'([A-Za-z])0([A-Za-z])')
+O_AT_START_RE = re.compile(r'^0', re.M)
+O_AFTER_LOWER_RE = re.compile(r'([a-z])0')
+O_BEFORE_LOWER_RE = re.compile(r'0([a-z])')
+L_BETWEEN_UPPER_RE = re.compile(r'([A-Z])1([A-Z])')
+L_BEFORE_LOWER_RE = re.compile(r'1([a-z])')
+NON_ASCII_RE = re.compile(r'[^\x00-\x7F]+')
+# Horizontal whitespace only; extract_ebay_listings walks the text by line
+WHITESPACE_RE = re.compile(r'[^\S\n]+')
+# Classifies a line of cleaned text by its start: a sold date, a price, or
+# condition/metadata text that is never part of a title; dispatch on lastgroup
+# (None for any other line). Cleaned text has single spaces only, so ' ' stands
+# in for \s+. Only the groups read back are capturing.
+LINE_RE = re.compile(
+    r' ?(?:Sold (?P<sold_date>[A-Za-z]+\.? \d{1,2},? \d{4})'
+    r'|(?P<price>\$)'
+    r'|(?P<metadata>(?i:Brand New|Pre-Owned|New|Used|For parts|or Best Offer|Buy It Now|Located in|View similar|Sell one|Extra)))?'
+)
+# A line can only hold a sold date if it starts with one of these
+SOLD_PREFIXES = ('Sold ', ' Sold ')
+PRICE_RE = re.compile(r'\$(\d+\.?\d{0,2})')
+# Possessive quantifiers (Python 3.11+) never give back characters, and the
+# lookbehind only lets a match start at the beginning of a username, where the
+# leftmost match always starts anyway; a long token without a % then fails in
+# one linear attempt instead of being retried from every offset
+SELLER_RE = re.compile(r'(?<![a-zA-Z0-9._-])([a-zA-Z0-9._-]++)\s++\d++\.?\d*+\s*+%')
+
+# Every div whose class list includes gallery-item, found in one C-level
+# tree walk; compiled once at import
+GALLERY_ITEMS_XPATH = etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' gallery-item ')]")
+
+# extract_ebay_listings line states
+SEEK_DATE = 'seek_date'
+IN_TITLE = 'in_title'
+IN_DETAILS = 'in_details'
+
+# Per-line parsing details are only printed with EBAY_DEBUG=1; from parallel
+# workers they interleave into noise and cost a stdout write each
+def debug(message):
+    if DEBUG:
+        print(message)
+
+def parse_gallery(html):
+    """Map each gallery item's data-id to its image src."""
+    page_images = {}
+    for gallery in GALLERY_ITEMS_XPATH(lxml.html.fromstring(html)):
+        img_id = gallery.get('data-id')
+        img_tag = gallery.find('.//img')
+        src = img_tag.get('src') if img_tag is not None else None
+        if img_id and src:
+            page_images[img_id] = src
+    return page_images
+
+def fetch_static_image_urls(url):
+    """Read gallery items straight from the served HTML, without a browser."""
+    try:
+        response = SESSION.get(url, timeout=10)
+        response.raise_for_status()
+        return parse_gallery(response.content)
+    except Exception as e:
+        print(f"Static fetch failed: {e}")
+        return {}
+
 def fetch_all_image_urls(base_url):
     """Fetch image URLs from the first page."""
+    page = 1
+    url = f"{base_url}?page={page}"
+    
+    # Only start headless Chrome when the gallery is rendered by JavaScript
+    page_images = fetch_static_image_urls(url)
+    if page_images:
+        print(f"Page {page}: Found {len(page_images)} images (static HTML)")
+        return page_images
+    print("No gallery items in static HTML, falling back to Selenium")
+    
     try:
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        # Only the gallery markup is needed: return at DOMContentLoaded and
+        # never download the images themselves, just read their src
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
         driver = webdriver.Chrome(options=chrome_options)
         
         all_image_urls = {}
-        page = 1
         
-        url = f"{base_url}?page={page}"
         print(f"Loading page {page}: {url}")
         driver.get(url)
         
         try:
             wait = WebDriverWait(driver, 60)
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".gallery-item")))
-            time.sleep(10)
             
-            # Wait until at least some gallery items are available
+            # Take the snapshot once the gallery item count has held steady for
+            # three polls in a row rather than after a fixed sleep, giving up
+            # after 30s
+            counts = []
+            def gallery_settled(d):
+                counts.append(d.execute_script("return document.querySelectorAll('.gallery-item').length"))
+                return len(counts) > 3 and counts[-1] > 0 and len(set(counts[-4:])) == 1
             try:
-                wait.until(lambda d: len(d.find_elements(By.CLASS_NAME, "gallery-item")) >= 5)
+                WebDriverWait(driver, 30, poll_frequency=0.5).until(gallery_settled)
             except:
                 print("Timeout waiting for items, proceeding with available.")
             
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            gallery_elements = soup.find_all('div', class_='gallery-item')
+            page_images = parse_gallery(driver.page_source)
             
-            if len(gallery_elements) == 0:
+            if len(page_images) == 0:
                 print(f"No gallery items found on page {page}. Stopping.")
+                driver.quit()
                 return {}
             
-            page_images = {}
-            for gallery in gallery_elements:
-                img_id = gallery.get('data-id')
-                img_tag = gallery.find('img')
-                src = img_tag.get('src') if img_tag else None
-                if img_id and src:
-                    page_images[img_id] = src
-            
             print(f"Page {page}: Found {len(page_images)} images")
             all_image_urls.update(page_images)
             
@@ -77,23 +180,41 @@ def fetch_all_image_urls(base_url):
             pass
         return {}
 
-def preprocess_image(image):
-    """Preprocess image for better OCR accuracy."""
-    img_array = np.array(image)
-    gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
+# Per-thread OpenCV objects, reused across images. A CLAHE instance is not
+# safe to share between threads.
+worker_local = threading.local()
+
+def preprocess_image(gray):
+    """Preprocess a grayscale image array for better OCR accuracy."""
+    # Downscale oversized screenshots; INTER_AREA averages rather than drops pixels
+    if OCR_MAX_EDGE:
+        scale = OCR_MAX_EDGE / max(gray.shape)
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    # Two scratch buffers per thread, reallocated only when the image size
+    # changes. The returned array is one of them, so it is only valid until
+    # this thread preprocesses its next image
+    buffers = getattr(worker_local, 'buffers', None)
+    if buffers is None or buffers[0].shape != gray.shape:
+        buffers = (np.empty(gray.shape, np.uint8), np.empty(gray.shape, np.uint8))
+        worker_local.buffers = buffers
+    enhanced, sharpened = buffers
     
     # Apply CLAHE for contrast enhancement
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    enhanced = clahe.apply(gray)
+    clahe = getattr(worker_local, 'clahe', None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        worker_local.clahe = clahe
+    clahe.apply(gray, enhanced)
     
     # Sharpen the image
-    kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-    sharpened = cv2.filter2D(enhanced, -1, kernel)
+    cv2.filter2D(enhanced, -1, SHARPEN_KERNEL, dst=sharpened)
     
-    # Adaptive threshold
-    thresh = cv2.adaptiveThreshold(sharpened, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-    
-    return Image.fromarray(thresh)
+    # Threshold, into the buffer CLAHE is done with
+    if OCR_THRESHOLD == 'otsu':
+        return cv2.threshold(sharpened, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=enhanced)[1]
+    return cv2.adaptiveThreshold(sharpened, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2, dst=enhanced)
 
 def clean_ocr_text(text):
     """Clean common OCR errors - less aggressive approach."""
@@ -102,130 +223,207 @@ def clean_ocr_text(text):
     
     # Be very careful with letter/number replacements
     # Only replace when it's clearly wrong in context
-    text = re.sub(r'([A-Za-z])0([A-Za-z])', r'\1o\2', text)  # o between letters
-    text = re.sub(r'^0', 'O', text)  # O at start of line
-    text = re.sub(r'([a-z])0', r'\1o', text)  # o after lowercase
-    text = re.sub(r'0([a-z])', r'o\1', text)  # o before lowercase
+    # Each group of passes is skipped outright when the text has nothing for
+    # it to change; the membership checks are single C scans
+    if '0' in text:
+        text = O_BETWEEN_LETTERS_RE.sub(r'\1o\2', text)  # o between letters
+        text = O_AT_START_RE.sub('O', text)  # O at start of line
+        text = O_AFTER_LOWER_RE.sub(r'\1o', text)  # o after lowercase
+        text = O_BEFORE_LOWER_RE.sub(r'o\1', text)  # o before lowercase
     
-    text = re.sub(r'([A-Z])1([A-Z])', r'\1l\2', text)  # l between uppercase
-    text = re.sub(r'1([a-z])', r'l\1', text)  # l before lowercase
+    if '1' in text:
+        text = L_BETWEEN_UPPER_RE.sub(r'\1l\2', text)  # l between uppercase
+        text = L_BEFORE_LOWER_RE.sub(r'l\1', text)  # l before lowercase
     
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)  # Remove non-ASCII
-    text = re.sub(r'\s+', ' ', text)  # Normalize spaces
+    if not text.isascii():
+        text = NON_ASCII_RE.sub(' ', text)  # Remove non-ASCII
+    text = WHITESPACE_RE.sub(' ', text)  # Normalize spaces, keeping line breaks
     return text.strip()
 
-def extract_ebay_listings(image_url, img_id):
-    """Extract eBay listings from the full image using simpler parsing."""
+def ocr_image(image):
+    """OCR a preprocessed 8-bit grayscale array as a single block of text (psm 6)."""
+    return pytesseract.image_to_string(image, config=TESSERACT_CONFIG)
+
+# Only add if we have the essential fields
+def add_listing(listings, sold_date, title, price, seller_id, image_url, img_id, timestamp):
+    if title and price:
+        listing = {
+            'sold_date': sold_date,
+            'title': title,
+            'sold_price': price,
+            'seller_id': seller_id,
+            'url': image_url,
+            'timestamp': timestamp,
+            'publicId': img_id
+        }
+        listings.append(listing)
+        debug(f"    ✓ Saved listing")
+    else:
+        missing = []
+        if not title: missing.append('title')
+        if not price: missing.append('price')
+        debug(f"    ✗ Missing: {', '.join(missing)}")
+
+def extract_ebay_listings(image_url, img_id, timestamp, cached_text=None):
+    """Extract eBay listings from the full image using simpler parsing.
+    
+    Returns (listings, raw OCR text); the text is None if extraction failed.
+    """
     try:
-        response = requests.get(image_url)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        
-        # Preprocess the image
-        processed_img = preprocess_image(img)
-        
-        # Perform OCR with simpler config (removed problematic whitelist)
-        custom_config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(processed_img, config=custom_config)
+        if cached_text is not None:
+            # Already OCR'd by an earlier run; only the parse is repeated
+            text = cached_text
+        else:
+            # Stream the body into a single bytes buffer rather than letting
+            # requests assemble .content from chunks
+            with SESSION.get(image_url, timeout=IMAGE_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                data = response.raw.read(decode_content=True)
+            
+            # Decode straight to grayscale; OpenCV handles RGB, RGBA and palette
+            # images alike, with no PIL round trip
+            gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                raise Exception('Could not decode image')
+            
+            # Preprocess the image
+            processed_img = preprocess_image(gray)
+            
+            # Perform OCR
+            text = ocr_image(processed_img)
         
         # Clean the text
         cleaned_text = clean_ocr_text(text)
         
-        lines = [line.strip() for line in cleaned_text.split('\n') if line.strip()]
-        
-        print(f"  OCR raw text: {text[:200]}...")
-        print(f"  OCR cleaned text: {cleaned_text[:200]}...")
-        print(f"  OCR: {len(lines)} lines")
+        debug(f"  OCR raw text: {text[:200]}...")
+        debug(f"  OCR cleaned text: {cleaned_text[:200]}...")
         
+        # Walk the lines once: find a sold date, collect title lines up to the
+        # price line, then scan from there for the price and seller
         listings = []
-        i = 0
+        state = SEEK_DATE
         
-        while i < len(lines):
-            line = lines[i]
-            
-            # Look for sold date pattern
-            sold_match = re.match(r'^Sold\s+([A-Za-z]+\.?\s+\d{1,2},?\s+\d{4})', line)
-            if not sold_match:
-                i += 1
+        for line in cleaned_text.split('\n'):
+            if state == SEEK_DATE:
+                # Most lines aren't dates; a prefix check rejects them before
+                # the regex runs
+                if not line.startswith(SOLD_PREFIXES):
+                    continue
+                match = LINE_RE.match(line)
+                if match.lastgroup == 'sold_date':
+                    # Found a sold listing
+                    sold_date = match.group('sold_date')
+                    debug(f"    Found sold date: {sold_date}")
+                    title_lines = []
+                    state = IN_TITLE
                 continue
             
-            # Found a sold listing
-            sold_date = sold_match.group(1)
-            print(f"    Found sold date: {sold_date}")
-            i += 1
-            
-            # Extract title - next non-empty line(s) until we hit a price
-            title_lines = []
-            while i < len(lines) and not re.match(r'^\$', lines[i]):
-                current_line = lines[i].strip()
-                # Skip condition lines and other metadata
-                if not re.match(r'^(Brand New|Pre-Owned|New|Used|For parts|or Best Offer|Buy It Now|Located in|View similar|Sell one|Extra)', current_line, re.I):
-                    if current_line and len(current_line) > 3:  # Minimum title length
-                        title_lines.append(current_line)
-                i += 1
+            line = line.strip()
+            if not line:
+                continue
             
-            title = ' '.join(title_lines).strip()
-            print(f"    Title: {title}")
+            if state == IN_TITLE:
+                kind = LINE_RE.match(line).lastgroup
+                if kind != 'price':
+                    # Skip condition lines and other metadata
+                    if kind != 'metadata' and len(line) > 3:  # Minimum title length
+                        title_lines.append(line)
+                    continue
+                
+                # The price line ends the title and is the first detail line
+                title = ' '.join(title_lines).strip()
+                debug(f"    Title: {title}")
+                price = None
+                seller_id = None
+                state = IN_DETAILS
             
-            # Extract price - look for $ pattern
-            price = None
-            seller_id = None
+            # Look for price
+            if not price and '$' in line:
+                price_match = PRICE_RE.search(line)
+                if price_match:
+                    price = price_match.group(1)
+                    debug(f"    Price: ${price}")
             
-            while i < len(lines) and (not price or not seller_id):
-                current_line = lines[i]
-                
-                # Look for price
-                if not price:
-                    price_match = re.search(r'\$(\d+\.?\d{0,2})', current_line)
-                    if price_match:
-                        price = price_match.group(1)
-                        print(f"    Price: ${price}")
-                
-                # Look for seller ID - alphanumeric with possible .-_ before percentage
-                if not seller_id:
-                    # Look for pattern: seller_id followed by percentage
-                    seller_match = re.search(r'([a-zA-Z0-9._-]+)\s+\d+\.?\d*\s*%', current_line)
-                    if seller_match:
-                        seller_id = seller_match.group(1)
-                        print(f"    Seller: {seller_id}")
-                
-                i += 1
-                if i >= len(lines):
-                    break
+            # Look for seller ID - alphanumeric with possible .-_ before percentage
+            if not seller_id and '%' in line:
+                seller_match = SELLER_RE.search(line)
+                if seller_match:
+                    seller_id = seller_match.group(1)
+                    debug(f"    Seller: {seller_id}")
             
-            # Only add if we have the essential fields
-            if title and price:
-                listing = {
-                    'sold_date': sold_date,
-                    'title': title,
-                    'sold_price': price,
-                    'seller_id': seller_id,
-                    'url': image_url,
-                    'timestamp': datetime.now().isoformat() + 'Z',
-                    'publicId': img_id
-                }
-                listings.append(listing)
-                print(f"    ✓ Saved listing")
-            else:
-                missing = []
-                if not title: missing.append('title')
-                if not price: missing.append('price')
-                print(f"    ✗ Missing: {', '.join(missing)}")
+            if price and seller_id:
+                add_listing(listings, sold_date, title, price, seller_id, image_url, img_id, timestamp)
+                state = SEEK_DATE
+        
+        # Lines ran out partway through a listing
+        if state == IN_TITLE:
+            title = ' '.join(title_lines).strip()
+            debug(f"    Title: {title}")
+            add_listing(listings, sold_date, title, None, None, image_url, img_id, timestamp)
+        elif state == IN_DETAILS:
+            add_listing(listings, sold_date, title, price, seller_id, image_url, img_id, timestamp)
         
         print(f"  ✓ Found {len(listings)} listings")
-        return listings
+        return listings, text
         
     except Exception as e:
         print(f"  ✗ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        if DEBUG:
+            traceback.print_exc()
+        return [], None
+
+def load_journal(filepath):
+    """Load listings appended by a run that did not reach the final save."""
+    if not os.path.exists(filepath):
         return []
+    
+    listings = []
+    with open(filepath, 'rb') as f:
+        for line in f:
+            try:
+                listings.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                # A crash mid-append can leave a torn last line
+                break
+    print(f"Recovered {len(listings)} journaled listings from {filepath}")
+    return listings
+
+# Raw OCR text by image id. An image whose listings were all duplicates, or
+# that had none, never lands in existing_ids, so without this it would be
+# downloaded and OCR'd again every run. Entries record the image URL they came
+# from, so a replaced screenshot misses the cache; failures are not cached.
+def load_ocr_cache(filepath):
+    """Load the OCR text cache if it exists, return empty dict if not."""
+    if not os.path.exists(filepath):
+        return {}
+    try:
+        with open(filepath, 'rb') as f:
+            cache = orjson.loads(f.read())
+    except Exception as e:
+        print(f"Error loading OCR cache: {e}")
+        return {}
+    print(f"Loaded {len(cache)} cached OCR texts from {filepath}")
+    return cache
+
+def get_cached_ocr_text(cache, img_id, url):
+    entry = cache.get(img_id)
+    if entry and entry.get('image_url') == url:
+        return entry['raw_text']
+    return None
+
+def save_ocr_cache(filepath, cache):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(cache, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    os.replace(tmp_path, filepath)
 
 def update_listings():
     """Main function."""
     base_url = 'http://www.alkalinetrioarchive.com/sales.html'
     output_dir = 'data'
     output_json = os.path.join(output_dir, 'ebaylistings.json')
+    journal_path = os.path.join(output_dir, 'ebaylistings.ndjson')
+    cache_path = os.path.join(output_dir, 'ebayOcrCache.json')
     
     os.makedirs(output_dir, exist_ok=True)
     
@@ -234,43 +432,67 @@ def update_listings():
     existing_combos = set()
     
     if os.path.exists(output_json):
-        with open(output_json, 'r') as f:
-            data = json.load(f)
+        with open(output_json, 'rb') as f:
+            data = orjson.loads(f.read())
             all_listings = data
             existing_ids = {item.get('publicId', '') for item in data}
-            for item in data:
-                combo = f"{item.get('title', '')}|{item.get('sold_price', '')}|{item.get('seller_id', '')}"
-                existing_combos.add(combo)
+            existing_combos = {(item.get('title', ''), item.get('sold_price', ''), item.get('seller_id', '')) for item in data}
     
     print(f"Loaded {len(all_listings)} existing listings\n")
     
-    image_urls = fetch_all_image_urls(base_url)
-    print(f"\nFound {len(image_urls)} images\n")
-    
     new_listings = []
     processed = 0
-    skipped = 0
     duplicates = 0
     
-    for img_id, img_url in image_urls.items():
-        if img_id not in existing_ids:
+    # Listings found by an interrupted run are not in the JSON yet
+    for listing in load_journal(journal_path):
+        combo = (listing['title'], listing['sold_price'], listing.get('seller_id', ''))
+        if combo not in existing_combos:
+            new_listings.append(listing)
+            existing_combos.add(combo)
+        existing_ids.add(listing['publicId'])
+    
+    image_urls = fetch_all_image_urls(base_url)
+    print(f"\nFound {len(image_urls)} images\n")
+    
+    # Drop already-processed images up front so only new ones reach the pool
+    todo = [(img_id, img_url) for img_id, img_url in image_urls.items() if img_id not in existing_ids]
+    skipped = len(image_urls) - len(todo)
+    print(f"Skipping {skipped} existing, processing {len(todo)}\n")
+    
+    # Download + Tesseract for each image is independent, and both release the
+    # GIL (socket I/O, tesseract subprocess, OpenCV), so run them on a thread
+    # pool. map() yields in submission order, so the dedupe order is unchanged.
+    # Each accepted listing is appended to the journal as it is found, so an
+    # interrupted run keeps its OCR work without rewriting the whole JSON
+    # One UTC timestamp for every listing found in this run
+    run_ts = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+    
+    ocr_cache = load_ocr_cache(cache_path)
+    with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as executor, \
+            open(journal_path, 'ab') as journal:
+        results = executor.map(extract_ebay_listings,
+                               [img_url for _, img_url in todo],
+                               [img_id for img_id, _ in todo],
+                               repeat(run_ts),
+                               [get_cached_ocr_text(ocr_cache, img_id, img_url) for img_id, img_url in todo])
+        for (img_id, img_url), (listings, text) in zip(todo, results):
             processed += 1
-            print(f"[{processed}] Processing: {img_id}")
-            listings = extract_ebay_listings(img_url, img_id)
+            print(f"[{processed}] Processed: {img_id}")
+            if text is not None:
+                ocr_cache[img_id] = {'image_url': img_url, 'raw_text': text}
             for listing in listings:
-                combo = f"{listing['title']}|{listing['sold_price']}|{listing.get('seller_id', '')}"
+                combo = (listing['title'], listing['sold_price'], listing.get('seller_id', ''))
                 if combo in existing_combos:
                     duplicates += 1
-                    print(f"    ⚠ Duplicate skipped")
+                    debug(f"    ⚠ Duplicate skipped")
                     continue
                 
                 new_listings.append(listing)
                 existing_combos.add(combo)
+                journal.write(orjson.dumps(listing) + b'\n')
+            journal.flush()
             existing_ids.add(img_id)
-        else:
-            skipped += 1
-            if skipped % 10 == 0:
-                print(f"[Skipped {skipped}...]")
     
     if new_listings:
         all_listings.extend(new_listings)
@@ -282,8 +504,23 @@ def update_listings():
         if duplicates > 0:
             print(f"  Skipped {duplicates} duplicates")
     
-    with open(output_json, 'w') as f:
-        json.dump(all_listings, f, indent=2)
+    # Write to a temp file and swap it in, so an interrupted save never leaves
+    # a truncated ebaylistings.json behind
+    tmp_path = output_json + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(all_listings, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, output_json)
+    
+    # Images with a saved listing are skipped by id from now on, and images gone
+    # from the gallery are never fetched again, so only the rest stay cached.
+    # An empty fetch (page load failure) says nothing about the gallery
+    listed_ids = {item.get('publicId') for item in all_listings}
+    ocr_cache = {img_id: entry for img_id, entry in ocr_cache.items()
+                 if img_id not in listed_ids and (not image_urls or img_id in image_urls)}
+    save_ocr_cache(cache_path, ocr_cache)
+    
+    # Everything journaled is now in the JSON
+    os.remove(journal_path)
     
     print(f"✓ Saved to {output_json}")
     return len(new_listings) > 0